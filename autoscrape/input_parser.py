@@ -2,6 +2,14 @@
 import re
 
 
+# split patterns for the input string, compiled once at import so the
+# generator body doesn't pay the re-cache lookup on every call
+_SEMI_RE = re.compile(r'(?<!\\);')
+_COMMA_RE = re.compile(r'(?<!\\),')
+# unescape \, and \; in a single pass
+_ESCAPE_RE = re.compile(r'\\([,;])')
+
+
 class InputParser:
     def __init__(self, input):
         self.input = input
@@ -49,15 +57,15 @@ class InputParser:
         # to clunky regex (which don't support ordering). Right now just
         # use GNU Parallel or something to do ranges.
         # split the independent searches first
-        inputs = re.split(r'(?<!\\);', self.input)
+        inputs = _SEMI_RE.split(self.input)
         for inp in inputs:
             indiv_search = []
             # split the inputs to be filled per search
-            indiv_inputs_list = re.split(r'(?<!\\),', inp)
+            indiv_inputs_list = _COMMA_RE.split(inp)
             for indiv_inputs in indiv_inputs_list:
                 # input type, input index, action
                 itype, ix, action = indiv_inputs.split(":", 2)
-                action = action.replace("\,", ",").replace("\;", ";")
+                action = _ESCAPE_RE.sub(r'\1', action)
                 ix = int(ix)
                 if itype == "i":
                     indiv_search.append({
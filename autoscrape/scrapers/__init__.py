@@ -1,10 +1,13 @@
 # -*- coding: UTF-8 -*-
 import datetime
 import hashlib
+import itertools
 import logging
 import os
+import queue
 import re
 import sys
+import threading
 import time
 
 from ..filetypes import TEXT_EXTENSIONS
@@ -21,6 +24,62 @@ class BaseScraper(object):
     A base class for common scraper functionality like loglevel
     parsing & setup, file saving, etc.
     """
+    # max queued file writes waiting on the background writer before
+    # a save blocks
+    write_queue_size = 16
+
+    def _file_writer(self):
+        """
+        Background worker that pops queued saves (pages, stylesheets,
+        screenshot PNGs) and writes them out, so the save I/O overlaps
+        with the scraper's next page navigation instead of blocking
+        the crawl.
+        """
+        while True:
+            filepath, data, fileclass, writetype, url, skip_existing = \
+                self._write_queue.get()
+            try:
+                write_file(
+                    filepath, data, fileclass=fileclass,
+                    writetype=writetype, output=self.output, url=url,
+                    skip_existing=skip_existing,
+                )
+            except Exception as e:
+                logger.error("[!] Error writing %s: %s" % (filepath, e))
+            finally:
+                self._write_queue.task_done()
+
+    def write_file_async(self, filepath, data, fileclass=None,
+                         writetype="w", url=None, skip_existing=False):
+        """
+        Queue a file write for the background writer thread. The
+        worker is started lazily since BaseScraper subclasses don't
+        share an __init__.
+        """
+        if not hasattr(self, "_write_queue"):
+            self._write_queue = queue.Queue(maxsize=self.write_queue_size)
+            threading.Thread(target=self._file_writer,
+                             daemon=True).start()
+        self._write_queue.put(
+            (filepath, data, fileclass, writetype, url, skip_existing)
+        )
+
+    def invalidate_page_cache(self):
+        """
+        Drop the cached page HTML. Scrapers call this after any
+        navigation or interaction that can change the DOM, including
+        ones that don't change the page URL (JS pagination).
+        """
+        self._page_html_cache = (None, None)
+
+    def flush_writes(self):
+        """
+        Block until all queued file writes have completed. Call this
+        before shutting down so no trailing saves are lost with the
+        daemon writer thread.
+        """
+        if hasattr(self, "_write_queue"):
+            self._write_queue.join()
 
     def setup_logging(self, loglevel=None, stdout=False):
         if loglevel == "DEBUG":
@@ -73,13 +132,27 @@ class BaseScraper(object):
                 required_width, required_height
             )
 
-        if re.match("^https?://", self.output):
-            screenshot_dir = "screenshots"
-        else:
-            screenshot_dir = os.path.join(self.output, "screenshots")
+        # output is fixed per instance, so resolve the screenshot
+        # directory once instead of re-matching and re-joining on
+        # every save
+        if not hasattr(self, "_screenshot_dir"):
+            if re.match("^https?://", self.output):
+                self._screenshot_dir = "screenshots"
+            else:
+                self._screenshot_dir = os.path.join(
+                    self.output, "screenshots"
+                )
 
-        filepath = os.path.join(screenshot_dir, "%s_%s.png" % (
-            int(time.time()), classname
+        # name screenshots with a per-run timestamp plus a monotonic
+        # counter: int(time.time()) alone collides (and overwrites)
+        # when consecutive screenshots land in the same second, which
+        # the 'next' iteration routines do routinely
+        if not hasattr(self, "_screenshot_counter"):
+            self._screenshot_counter = itertools.count()
+            self._screenshot_run_id = int(time.time())
+        filepath = os.path.join(self._screenshot_dir, "%s_%05d_%s.png" % (
+            self._screenshot_run_id, next(self._screenshot_counter),
+            classname
         ))
 
         png = None
@@ -105,10 +178,12 @@ class BaseScraper(object):
         #         logger.warn("Error saving screenshot: %s" % e)
 
         if png and self.output:
-            write_file(
+            # hand the PNG off to the background writer; the Selenium
+            # RPC above has to happen on this thread, but the write
+            # doesn't need to block the crawl
+            self.write_file_async(
                 filepath, png, fileclass="screenshot",
-                writetype="wb", output=self.output,
-                url=self.control.scraper.page_url,
+                writetype="wb", url=self.control.scraper.page_url,
             )
 
         if self.full_page_screenshots:
@@ -130,17 +205,34 @@ class BaseScraper(object):
         if classname not in self.training_classes:
             raise ValueError("Base class speficied: %s" % classname)
 
-        # always keep filename for downloads, for now
-        if not self.output or re.match("^https?://", self.output):
-            classdir = classname
-        else:
-            classdir = os.path.join(self.output, classname)
+        # always keep filename for downloads, for now. class
+        # directories are also fixed per instance, so memoize the
+        # resolved paths across saves
+        if not hasattr(self, "_class_dirs"):
+            self._class_dirs = {}
+        classdir = self._class_dirs.get(classname)
+        if classdir is None:
+            if not self.output or re.match("^https?://", self.output):
+                classdir = classname
+            else:
+                classdir = os.path.join(self.output, classname)
+            self._class_dirs[classname] = classdir
 
         data = None
         if url is None:
             # TODO: migrate over
-            data = self.control.scraper.page_html
+            # page_html is a webdriver RPC in the Selenium backend, so
+            # reuse the HTML fetched by an earlier save at the same
+            # page. the scrapers invalidate this cache on navigation
             url = self.control.scraper.page_url
+            cached_url, cached_html = getattr(
+                self, "_page_html_cache", (None, None)
+            )
+            if url is not None and url == cached_url:
+                data = cached_html
+            else:
+                data = self.control.scraper.page_html
+                self._page_html_cache = (url, data)
         else:
             data = self.control.scraper.download_file(url)
 
@@ -156,15 +248,28 @@ class BaseScraper(object):
 
         # hash the contents of the file, so we don't *not* save dynamic
         # JS pages with the same URl and that we *don't* excessively save
-        # the same page over and over
+        # the same page over and over. the hash is only used as a
+        # content-addressed filename, so a short non-cryptographic
+        # digest (BLAKE2b-64) is plenty and much cheaper than SHA-256
         if type(data) == bytes:
-            sha256 = hashlib.sha256()
-            sha256.update(data)
-            h = sha256.digest().hex()
-            writetype = "wb"
+            encoded = data
         else:
-            h = hashlib.sha256(data.encode("utf-8")).digest().hex()
-            writetype = "w"
+            # encode once here and write the bytes directly, so the
+            # file writer doesn't have to UTF-8 encode a second time
+            encoded = data.encode("utf-8")
+
+        # remember which hash-named paths were already written so
+        # identical pages (the "next" button routines save the same
+        # DOM several times in a row) can skip the rewrite. keyed on
+        # the full filepath, not the hash, because the same DOM is
+        # legitimately saved under several class directories. lazily
+        # initialized since BaseScraper subclasses don't share an
+        # __init__
+        if not hasattr(self, "_written_paths"):
+            self._written_paths = set()
+
+        h = hashlib.blake2b(encoded, digest_size=8).hexdigest()
+        writetype = "wb"
 
         logger.debug("URL: %s, Hash: %s, Extension: %s" % (url, h, ext))
 
@@ -178,12 +283,20 @@ class BaseScraper(object):
             filepath = os.path.join(classdir, "%s.%s" % (h, ext))
 
         crawl_data = None
-        if self.output:
-            write_file(
-                filepath, data, fileclass=classname,
-                writetype=writetype, output=self.output,
+        # hash-named files are content-addressed, so a path we've
+        # already written means the identical file is on disk and the
+        # write (and its syscalls) can be skipped entirely
+        already_written = not self.keep_filename and \
+            filepath in self._written_paths
+        if self.output and not already_written:
+            self.write_file_async(
+                filepath, encoded, fileclass=classname,
+                writetype=writetype,
                 url=self.control.scraper.page_url,
+                skip_existing=not self.keep_filename,
             )
+            if not self.keep_filename:
+                self._written_paths.add(filepath)
         if self.return_data:
             now = datetime.datetime.utcnow()
             crawl_data = {
@@ -193,16 +306,19 @@ class BaseScraper(object):
             }
 
         # only save stylesheets for web content types
-        if link_to_text and not self.disable_style_saving:
+        save_style = self.output and not already_written
+        if link_to_text and not self.disable_style_saving and \
+           (save_style or self.return_data):
             logger.debug("[.] Saving stylesheet")
             style_filepath = "%s.css" % filepath
             # this will save stylesheet as filepath.html.css
             stylesheet = self.control.scraper.get_stylesheet()
-            if self.output:
-                write_file(
+            if save_style:
+                self.write_file_async(
                     style_filepath, stylesheet,
-                    fileclass=classname, output=self.output,
+                    fileclass=classname,
                     url=self.control.scraper.page_url,
+                    skip_existing=not self.keep_filename,
                 )
             if self.return_data:
                 crawl_data["css"] = stylesheet
@@ -228,8 +344,7 @@ class BaseScraper(object):
 
         filename = "%s.gpickle" % int(time.time() * 1000)
         basedir = os.path.join(self.output, "graph")
-        if not os.path.exists(basedir):
-            os.makedirs(basedir)
+        os.makedirs(basedir, exist_ok=True)
 
         graph_save_path = os.path.join(basedir, filename)
         logger.debug("[.] Saving graph to: %s" % graph_save_path)
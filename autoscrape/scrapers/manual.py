@@ -15,11 +15,11 @@ class ManualControlScraper(BaseScraper):
     A Depth-First Search scraper that looks for forms, inputs, and next
     buttons by some manual criteria and iterates accordingly.
     """
-    training_classes = [
+    training_classes = frozenset([
         "data_pages", "error_pages", "links_to_documents",
         "links_to_search", "search_pages", "crawl_pages",
         "interaction_pages",
-    ]
+    ])
 
     # TODO: save the path to the matched search form to a file. then
     # upon subsequent loads, we can try that path first and then go
@@ -110,24 +110,24 @@ class ManualControlScraper(BaseScraper):
         else:
             self.input_gen = []
 
-    def click_until_no_links(self, links):
+    def click_until_no_links(self):
         if self.max_pages is not None and self.total_pages >= self.max_pages:
             logger.info(" - Maximum pages %s reached, returning..." % self.max_pages)
             return
 
         link_vectors = self.control.link_vectors()
-        link_zip = list(zip(range(len(link_vectors)), link_vectors))
         link_zip = filter(
             lambda x: re.findall(self.result_page_links, x[1]),
-            link_zip
+            enumerate(link_vectors)
         )
         # Click until we get no more matches
         for ix, text in link_zip:
             logger.debug("Trying to click ix: %s, text: %s" % (ix, text))
             logger.debug(" - Current URL: %s" % (self.control.scraper.page_url))
             if self.control.select_link(ix):
+                self.invalidate_page_cache()
                 self.total_pages += 1
-                self.click_until_no_links(links)
+                self.click_until_no_links()
                 self.save_training_page(classname="data_pages")
                 self.save_screenshot(classname="data_pages")
                 # # TODO: we need to know if the page URL changed
@@ -141,6 +141,8 @@ class ManualControlScraper(BaseScraper):
         """
         logger.debug("[*] Entering 'next' iteration routine")
         depth = 0
+        # lowercase the match string once, not per button per page
+        next_match = self.next_match.lower()
         while True:
             if self.formdepth and depth > self.formdepth:
                 logger.debug("[!] Max 'next' formdepth reached %s" % depth)
@@ -159,15 +161,23 @@ class ManualControlScraper(BaseScraper):
             self.save_screenshot(classname="data_pages")
 
             if self.result_page_links:
-                self.click_until_no_links(self.result_page_links)
+                self.click_until_no_links()
+
+            # lower each button text once and check the whole batch
+            # with a single containment test first, so the common "no
+            # next button on this page" termination path skips the
+            # per-button scan entirely
+            buttons_lower = [b.lower() for b in button_data]
+            if next_match in "\x00".join(buttons_lower):
+                for ix, button_lower in enumerate(buttons_lower):
+                    logger.debug("Checking button: %s" % button_data[ix])
+                    if next_match not in button_lower:
+                        continue
 
-            for ix in range(n_buttons):
-                button = button_data[ix]
-                logger.debug("Checking button: %s" % button)
-                if self.next_match.lower() in button.lower():
                     logger.debug("Next button found! Clicking: %s" % ix)
                     depth += 1
                     self.control.select_button(ix, iterating_form=True)
+                    self.invalidate_page_cache()
                     # subsequent page loads get saved here
                     self.save_training_page(classname="data_pages")
                     self.save_screenshot(classname="data_pages")
@@ -183,12 +193,15 @@ class ManualControlScraper(BaseScraper):
         for _ in range(depth):
             logger.debug("Going back from 'next'...")
             self.control.back()
+        if depth:
+            self.invalidate_page_cache()
 
     def scrape(self, depth=0):
         logger.info("[.] Crawl depth %s" % depth)
         if self.maxdepth != -1 and depth > self.maxdepth:
             logger.info(" - Maximum depth %s reached, returning..." % depth)
             self.control.back()
+            self.invalidate_page_cache()
             return
         if self.max_pages is not None and self.total_pages >= self.max_pages:
             logger.info(" - Maximum pages %s reached, returning..." % self.max_pages)
@@ -206,22 +219,23 @@ class ManualControlScraper(BaseScraper):
         scraped = False
         form_vectors = self.control.form_vectors(type="text")
 
+        # lowercase the match string once, not per form vector
+        form_match = self.form_match.lower() if self.form_match else None
+
         # NOTE: we never get into this loop if self.input_gen is empty
         # this arises when input was not handed to the initializer
-        for ix in range(len(form_vectors)):
+        for ix, form_data in enumerate(form_vectors):
             # don't bother with looking for forms if we didn't specify
             # th form_match option
-            if not self.form_match:
+            if not form_match:
                 continue
 
-            form_data = form_vectors[ix]
-
             # inputs are keyed by form index, purely here for debug purposes
             inputs = self.control.inputs[ix]
             logger.debug("Form: %s Text: %s" % (ix, form_data))
             logger.debug("Inputs: %s" % inputs)
 
-            if self.form_match.lower() not in form_data.lower():
+            if form_match not in form_data.lower():
                 continue
 
             logger.debug("*** Found an input form!")
@@ -261,12 +275,14 @@ class ManualControlScraper(BaseScraper):
 
                 self.save_screenshot(classname="interaction_pages")
                 self.control.submit(ix)
+                self.invalidate_page_cache()
                 self.total_pages += 1
                 logger.debug("Beginning iteration of data pages")
                 self.save_screenshot(classname="interaction_pages")
                 self.keep_clicking_next_btns()
                 scraped = True
                 self.control.back()
+                self.invalidate_page_cache()
 
             logger.debug("[*] Completed iteration!")
             # Only scrape a single form, due to explicit, single
@@ -278,7 +294,9 @@ class ManualControlScraper(BaseScraper):
 
         link_vectors = self.control.link_vectors()
         logger.debug("[.] Links on page: %s" % (link_vectors))
-        link_zip = list(zip(range(len(link_vectors)), link_vectors))
+        # lazy index/text pairs; nothing below needs the materialized
+        # list except the priority sort, which makes its own
+        link_zip = enumerate(link_vectors)
         if self.ignore_links:
             logger.debug(" - Ignoring links matching: %s" % self.ignore_links)
             link_zip = filter(
@@ -293,9 +311,14 @@ class ManualControlScraper(BaseScraper):
             )
         if self.link_priority:
             logger.debug(" - Sorting by link priority: %s" % self.link_priority)
-            link_zip.sort(
-                key=lambda x: not re.findall(self.link_priority, x[1])
-            )
+            prio_re = re.compile(self.link_priority)
+            link_zip = list(link_zip)
+            # precompute the match keys in one pass, then sort indices
+            # over them rather than running the regex inside the sort
+            # key on link-heavy pages
+            keys = [not prio_re.search(text) for _, text in link_zip]
+            order = sorted(range(len(link_zip)), key=keys.__getitem__)
+            link_zip = [link_zip[ix] for ix in order]
 
         for ix, text in link_zip:
             logger.debug(" - Link index: %s text: %s" % (ix, text))
@@ -311,6 +334,7 @@ class ManualControlScraper(BaseScraper):
             if self.control.select_link(ix):
                 logger.debug("[.] Link clicked. Going a level deeper...")
                 logger.debug(" - Current URL: %s" % (self.control.scraper.page_url))
+                self.invalidate_page_cache()
                 self.total_pages += 1
                 self.scrape(depth=depth + 1)
             else:
@@ -318,12 +342,22 @@ class ManualControlScraper(BaseScraper):
 
         logger.debug("[*] Searching forms and links on page complete")
         self.control.back()
+        self.invalidate_page_cache()
 
     def run(self, *args, **kwargs):
         # we have to catch this so, in the case of failure, we
         # don't have random browser windows hanging around
-        # try:
-        self.scrape(*args, **kwargs)
+        try:
+            self.scrape(*args, **kwargs)
+        finally:
+            # always drain the queued saves and close the browser,
+            # even when the crawl raises — a crash is exactly when the
+            # already-captured pages need to make it to disk
+            self.flush_writes()
+            try:
+                self.control.scraper.driver.quit()
+            except Exception:
+                pass
         # except Exception as e:
         #     msg = "[!] Fatal error scraping: %s. Cleaning up, quitting."
         #     logger.error(msg % (e))
@@ -336,10 +370,5 @@ class ManualControlScraper(BaseScraper):
         #     logger.info("[+] AutoScrape run complete.")
         #     if self.output and self.save_graph:
         #         self.save_scraper_graph()
-        try:
-            self.control.scraper.driver.quit()
-        except Exception:
-            pass
-
         if self.return_data:
             return self.crawl_data
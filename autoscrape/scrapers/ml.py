@@ -3,6 +3,8 @@ import logging
 import string
 from itertools import product
 
+import numpy as np
+
 from . import BaseScraper
 from ..control import Controller
 
@@ -33,10 +35,28 @@ class MLAutoScraper(BaseScraper):
         # the current path to wherever we are at
         self.path = []
 
+    # above this many character combinations, generate inputs lazily
+    # instead of materializing the full vectorized array in memory
+    max_vectorized_inputs = 500000
+
     def input_generator(self, length=1):
-        chars = string.ascii_lowercase
-        for input in product(chars, repeat=length):
-            yield "".join(input)
+        if len(string.ascii_lowercase) ** length > self.max_vectorized_inputs:
+            # too many combinations to precompute: fuse product
+            # straight into "".join via map, which runs the join at C
+            # speed without a Python-level loop body per tuple
+            yield from map("".join, product(string.ascii_lowercase,
+                                            repeat=length))
+            return
+        # precompute every combination in one vectorized pass instead
+        # of allocating a Python tuple and doing a "".join per yield
+        chars = np.array(list(string.ascii_lowercase), dtype="U1")
+        idx = np.indices((len(chars),) * length).reshape(length, -1)
+        strings = chars[idx[0]]
+        for axis in range(1, length):
+            strings = np.char.add(strings, chars[idx[axis]])
+        # convert to native str in one bulk C-level pass; iterating the
+        # array directly would box a fresh numpy scalar per element
+        yield from strings.tolist()
 
     def keep_clicking_next_btns(self, maxdepth=0):
         depth = 0
@@ -49,13 +69,14 @@ class MLAutoScraper(BaseScraper):
             button_data = self.control.button_vectors()
             logger.debug("Button vectors %s" % button_data)
 
-            for ix in range(len(button_data)):
+            # lower each button text once, not per containment test
+            buttons_lower = [b.lower() for b in button_data]
+            for ix, button_lower in enumerate(buttons_lower):
                 logger.debug("Depth %s" % depth)
-                button = button_data[ix]
-                logger.debug("Checking button %s" % button)
+                logger.debug("Checking button %s" % button_data[ix])
                 # TODO: replace with ML model? Determine whether a link
                 # or button is a "next" button?
-                if "next page" in button.lower():
+                if "next page" in button_lower:
                     logger.debug("Clicking button %s..." % ix)
                     depth += 1
                     self.control.select_button(ix, iterating_form=True)
@@ -71,12 +92,12 @@ class MLAutoScraper(BaseScraper):
             logger.debug("[-] Going back from 'next'...")
             self.control.back()
 
-    def run(self, depth=0):
-        if depth > self.maxdepth:
-            logger.debug(" - Maximum depth %s reached, returning..." % depth)
-            self.control.back()
-            return
-
+    def visit_page(self, depth):
+        """
+        Do the single-page work for the current DOM at the given crawl
+        depth: classify the page and iterate any matching search form.
+        Returns the clickable links to continue the crawl with.
+        """
         logger.debug("** DEPTH %s" % depth)
 
         # TODO: ML model will go here. What type of page is this?
@@ -86,8 +107,7 @@ class MLAutoScraper(BaseScraper):
         logger.debug(" - Page vector x=%s" % x)
 
         form_vectors = self.control.form_vectors(type="text")
-        for ix in range(len(form_vectors)):
-            form_data = form_vectors[ix]
+        for ix, form_data in enumerate(form_vectors):
             # inputs are keyed by form index
             inputs = self.control.inputs[ix]
 
@@ -115,15 +135,39 @@ class MLAutoScraper(BaseScraper):
 
         links = self.control.clickable
         logger.debug(" - All tags at this depth %s" % links)
+        return links
 
-        # TODO: ML model will go here: Which link should we click on?
-        # This may be a job best suited for RL, but we could use a
-        # simple classifier to order the links by most likely to lead
-        # to a search form page.
-        for ix in range(len(links)):
-            logger.debug(" - Attempting click on link %s" % ix)
-            if self.control.select_link(ix):
-                logger.debug("[.] Clicked! Recursing ...")
-                self.run(depth=depth + 1)
-
-        self.control.back()
+    def run(self, depth=0):
+        # DFS with an explicit stack rather than recursion, so deep
+        # crawls don't pay a Python frame per followed link or hit the
+        # recursion limit. each frame is [depth, links, next link index
+        # to try]; links stays None until the page work has run, and a
+        # frame is popped (with a browser back()) once its links are
+        # exhausted
+        stack = [[depth, None, 0]]
+        while stack:
+            frame = stack[-1]
+            if frame[1] is None:
+                if frame[0] > self.maxdepth:
+                    logger.debug(
+                        " - Maximum depth %s reached, returning..." % frame[0])
+                    self.control.back()
+                    stack.pop()
+                    continue
+                frame[1] = self.visit_page(frame[0])
+
+            # TODO: ML model will go here: Which link should we click
+            # on? This may be a job best suited for RL, but we could
+            # use a simple classifier to order the links by most likely
+            # to lead to a search form page.
+            if frame[2] < len(frame[1]):
+                ix = frame[2]
+                frame[2] += 1
+                logger.debug(" - Attempting click on link %s" % ix)
+                if self.control.select_link(ix):
+                    logger.debug("[.] Clicked! Recursing ...")
+                    stack.append([frame[0] + 1, None, 0])
+                continue
+
+            self.control.back()
+            stack.pop()
@@ -55,10 +55,13 @@ def get_extension_from_url(url):
 
 
 def write_file(filepath, data, fileclass=None, writetype="w", output=None,
-               url=None):
+               url=None, skip_existing=False):
     """
     Write out a scraped data file to disk or a remote callback,
-    specified in output parameter.
+    specified in output parameter. skip_existing is for
+    content-addressed (hash-named) files: when set, a file that
+    already exists on disk holds these exact bytes, so the write is
+    skipped.
     """
     logger.debug("[.] Writing file: %s to: %s" % (filepath, output))
     if not output:
@@ -90,7 +93,29 @@ def write_file(filepath, data, fileclass=None, writetype="w", output=None,
     # filesystem mode
     else:
         dirpath = os.path.dirname(filepath)
-        if not os.path.exists(dirpath):
-            os.makedirs(dirpath)
-        with open(filepath, writetype) as f:
-            f.write(data)
+        os.makedirs(dirpath, exist_ok=True)
+        if type(data) != bytes:
+            data = data.encode("utf-8")
+        # the data is already one contiguous buffer, so write it with
+        # a single unbuffered syscall instead of paying for the
+        # buffered file object's extra copy (and, for text mode, a
+        # second encode of multi-MB pages). O_EXCL lets the filesystem
+        # detect revisits of content-addressed files so we skip
+        # rewriting identical bytes
+        flags = os.O_WRONLY | os.O_CREAT
+        flags |= os.O_EXCL if skip_existing else os.O_TRUNC
+        try:
+            fd = os.open(filepath, flags, 0o644)
+        except FileExistsError:
+            logger.debug("[.] File exists, skipping: %s" % filepath)
+            return
+        try:
+            # os.write may write fewer bytes than requested (large
+            # buffers, ENOSPC mid-write), so loop until everything
+            # has landed
+            view = memoryview(data)
+            written = 0
+            while written < len(view):
+                written += os.write(fd, view[written:])
+        finally:
+            os.close(fd)
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+from autoscrape.scrapers import BaseScraper
+
+
+class FakeScraper:
+    page_url = "http://example.com/page"
+    page_html = "<html><body>hello</body></html>"
+
+    def get_stylesheet(self):
+        return ""
+
+
+class FakeControl:
+    def __init__(self):
+        self.scraper = FakeScraper()
+
+
+class Scraper(BaseScraper):
+    training_classes = frozenset(["crawl_pages", "search_pages"])
+
+    def __init__(self, output):
+        self.output = output
+        self.return_data = False
+        self.max_pages = None
+        self.keep_filename = False
+        self.disable_style_saving = True
+        self.control = FakeControl()
+
+
+class TestSaveTrainingPage(unittest.TestCase):
+    def test_same_page_saved_under_two_classes(self):
+        # scrape saves the same DOM under crawl_pages and then
+        # search_pages; the rewrite-skip must not suppress the
+        # second class directory's copy
+        output = tempfile.mkdtemp()
+        scraper = Scraper(output)
+        scraper.save_training_page(classname="crawl_pages")
+        scraper.save_training_page(classname="search_pages")
+        scraper.flush_writes()
+        for classname in ("crawl_pages", "search_pages"):
+            classdir = os.path.join(output, classname)
+            self.assertEqual(len(os.listdir(classdir)), 1)
+
+    def test_repeat_save_writes_single_file(self):
+        output = tempfile.mkdtemp()
+        scraper = Scraper(output)
+        scraper.save_training_page(classname="crawl_pages")
+        scraper.save_training_page(classname="crawl_pages")
+        scraper.flush_writes()
+        classdir = os.path.join(output, "crawl_pages")
+        self.assertEqual(len(os.listdir(classdir)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()